@@ -0,0 +1,40 @@
+"""
+Warm the numba JIT cache for the stats kernels.
+
+The kernels below are decorated with @njit(cache=True), so the compiled
+machine code is persisted under __pycache__ after the first call. Run
+this script once after changing a kernel module (or on a fresh checkout)
+so analysis runs do not pay the ~1 s LLVM compile on their first
+comparison. A no-op if numba is not installed.
+
+numba's ahead-of-time compiler (numba.pycc) was removed upstream, so
+cache warming is the supported way to keep compilation out of the hot
+path.
+"""
+import time
+
+import stats_kernels
+
+# One representative call per kernel compiles and caches it; since the
+# analysis scripts consolidated onto stats_kernels this is the only
+# njit kernel in the tree
+_KERNELS = [
+    ("stats_kernels._stats_kernel", stats_kernels._stats_kernel,
+     (0.5, 0.5, 100.0, 100.0, 200.0, 200.0, 0.01)),
+]
+
+
+def main():
+    for name, kernel, args in _KERNELS:
+        start = time.perf_counter()
+        kernel(*args)
+        elapsed = time.perf_counter() - start
+
+        if type(kernel).__name__ == "CPUDispatcher":
+            print(f"{name} compiled and cached in {elapsed:.2f}s")
+        else:
+            print(f"{name}: numba not installed; runs as plain Python")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
 import numpy as np
-import scipy.stats as stats
-import pandas as pd
-from math import sqrt
+
+from stats_kernels import (proportion_compare, proportion_compare_batch,
+                           batch_to_rows, format_p_value, apa_table_string)
 
 def analyze_proportion_comparison(p1, p2, n1, n2, study_name=""):
     """
     Analyze the comparison between two proportions with comprehensive statistics.
 
+    Thin wrapper around the shared kernel in stats_kernels; this script uses
+    the unrounded p*n counts it has always used.
+
     Parameters:
     -----------
     p1, p2 : float
@@ -21,52 +24,7 @@ def analyze_proportion_comparison(p1, p2, n1, n2, study_name=""):
     dict
         Dictionary containing all calculated statistics
     """
-    # Variance and standard error
-    var1 = p1 * (1 - p1) / n1
-    var2 = p2 * (1 - p2) / n2
-    se_diff = sqrt(var1 + var2)
-
-    # Z-test and confidence interval
-    pooled_p = (n1 * p1 + n2 * p2) / (n1 + n2)
-    pooled_se = sqrt(pooled_p * (1 - pooled_p) * (1 / n1 + 1 / n2))
-    z_stat = (p1 - p2) / pooled_se
-    p_value_z = 2 * (1 - stats.norm.cdf(abs(z_stat)))
-    z_critical = 1.96
-    z_ci_lower = (p1 - p2) - z_critical * pooled_se
-    z_ci_upper = (p1 - p2) + z_critical * pooled_se
-
-    # Cohen's h
-    cohens_h = 2 * (np.arcsin(np.sqrt(p1)) - np.arcsin(np.sqrt(p2)))
-
-    # Effect size interpretation
-    abs_h = abs(cohens_h)
-    if abs_h < 0.2:
-        effect_size = "Negligible"
-    elif abs_h < 0.5:
-        effect_size = "Small"
-    elif abs_h < 0.8:
-        effect_size = "Medium"
-    else:
-        effect_size = "Large"
-
-    # Chi-square test
-    obs = np.array([[p1 * n1, (1 - p1) * n1], [p2 * n2, (1 - p2) * n2]])
-    chi2, p_chi2, _, _ = stats.chi2_contingency(obs)
-
-    return {
-        "study": study_name,
-        "group1_prop": p1,
-        "group2_prop": p2,
-        "difference": p1 - p2,
-        "z_statistic": z_stat,
-        "p_value_z": p_value_z,
-        "z_ci_lower": z_ci_lower,
-        "z_ci_upper": z_ci_upper,
-        "cohens_h": cohens_h,
-        "effect_size": effect_size,
-        "chi_square": chi2,
-        "p_value_chi2": p_chi2
-    }
+    return proportion_compare(p1, p2, n1, n2, study_name, rounded=False)
 
 def print_results(results):
     """
@@ -83,32 +41,14 @@ def print_results(results):
     print(f"\nChi-square statistic: {results['chi_square']:.3f}")
     print(f"Chi-square p-value: {results['p_value_chi2']:.6f}")
 
-def create_apa_table(results_list):
+def format_apa_rows(results_list):
     """
-    Create a dataframe with APA-style formatting of results
-
-    Parameters:
-    -----------
-    results_list : list
-        List of result dictionaries
-
-    Returns:
-    --------
-    pandas.DataFrame
-        DataFrame with APA-style results
+    Format results as a list of APA-style row dicts (all values strings).
     """
     apa_results = []
 
     for r in results_list:
-        # Format p-value
-        if r['p_value_z'] < 0.001:
-            p_formatted = "p < .001"
-        elif r['p_value_z'] < 0.01:
-            p_formatted = "p < .01"
-        elif r['p_value_z'] < 0.05:
-            p_formatted = "p < .05"
-        else:
-            p_formatted = f"p = {r['p_value_z']:.3f}"
+        p_formatted = format_p_value(r['p_value_z'])
 
         # Format Cohen's h and Z
         h_formatted = f"{r['cohens_h']:.2f}"
@@ -127,80 +67,74 @@ def create_apa_table(results_list):
         }
         apa_results.append(apa_row)
 
-    return pd.DataFrame(apa_results)
+    return apa_results
+
+
+def create_apa_table(results_list):
+    """
+    Create a dataframe with APA-style formatting of results
+
+    Parameters:
+    -----------
+    results_list : list
+        List of result dictionaries
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame with APA-style results
+    """
+    # pandas is only needed when a DataFrame is explicitly requested
+    import pandas as pd
+    return pd.DataFrame(format_apa_rows(results_list))
 
 # Example usage
 if __name__ == "__main__":
-    # Study proportions
-    study1_n_oa_OAI_o3 = 0.67
-    study1_n_tb_OAI_o3 = 0.575
-    study1_n_oa_OAI_41 = 0.545
-    study1_n_tb_OAI_41 = 0.945
-    study1_n_oa_ANT_37 = 0.695
-    study1_n_tb_ANT_37 = 0.665
-    study1_n_oa_ANT_35 = 0.625
-    study1_n_tb_ANT_35 = 0.795
-    study1_n_oa_DS_r1 = 0.525
-    study1_n_tb_DS_r1 = 0.925
-    study1_n_oa_DS_v3 = 0.54
-    study1_n_tb_DS_v3 = 0.6
-
-    study2_v_oa_OAI_o3 = 0.745
-    study2_v_tb_OAI_o3 = 0.575
-    study2_v_oa_OAI_41 = 0.55
-    study2_v_tb_OAI_41 = 0.93
-    study2_v_oa_ANT_37 = 0.595
-    study2_v_tb_ANT_37 = 0.29
-    study2_v_oa_ANT_35 = 0.625
-    study2_v_tb_ANT_35 = 0.795
-    study2_v_oa_DS_r1 = 0.61
-    study2_v_tb_DS_r1 = 0.69
-    study2_v_oa_DS_v3 = 0.505
-    study2_v_tb_DS_v3 = 0.535
-
-    study3_br_oa_OAI_o3 = 0.67
-    study3_br_tb_OAI_o3 = 0.565
-    study3_br_oa_OAI_41 = 0.62
-    study3_br_tb_OAI_41 = 0.85
-    study3_br_oa_ANT_37 = 0.63
-    study3_br_tb_ANT_37 = 0.39
-    study3_br_oa_ANT_35 = 0.555
-    study3_br_tb_ANT_35 = 0.555
-    study3_br_oa_DS_r1 = 0.565
-    study3_br_tb_DS_r1 = 0.745
-    study3_br_oa_DS_v3 = 0.525
-    study3_br_tb_DS_v3 = 0.525   
-
     n1 = n2 = 200
 
-    # Run analysis
-    results1 = analyze_proportion_comparison(study1_n_oa_OAI_o3,study1_n_oa_OAI_41, n1, n2, "Study 1 - OAI o3 vs OAI 41")
-    results2 = analyze_proportion_comparison(study1_n_tb_OAI_o3, study1_n_tb_OAI_41, n1, n2, "Study 1 - OAI o3 vs OAI 41")
-    results3 = analyze_proportion_comparison(study1_n_oa_ANT_37, study1_n_oa_ANT_35, n1, n2, "Study 1 - ANT 37 vs ANT 35")
-    results4 = analyze_proportion_comparison(study1_n_tb_ANT_37, study1_n_tb_ANT_35, n1, n2, "Study 1 - ANT 37 vs ANT 35")
-    results5 = analyze_proportion_comparison(study1_n_oa_DS_r1, study1_n_oa_DS_v3, n1, n2, "Study 1 - DS r1 vs DS v3"),
-    results6 = analyze_proportion_comparison(study1_n_tb_DS_r1, study1_n_tb_DS_v3, n1, n2, "Study 1 - DS r1 vs DS v3")
-
-    # Print detailed results
-    results = [
-        analyze_proportion_comparison(study1_n_oa_OAI_o3,study1_n_oa_OAI_41, n1, n2, "Study 1 - OAI o3 vs OAI 41"),
-        analyze_proportion_comparison(study1_n_tb_OAI_o3, study1_n_tb_OAI_41, n1, n2, "Study 1 - OAI o3 vs OAI 41"),
-        analyze_proportion_comparison(study1_n_oa_ANT_37, study1_n_oa_ANT_35, n1, n2, "Study 1 - ANT 37 vs ANT 35"),
-        analyze_proportion_comparison(study1_n_tb_ANT_37, study1_n_tb_ANT_35, n1, n2, "Study 1 - ANT 37 vs ANT 35"),
-        analyze_proportion_comparison(study1_n_oa_DS_r1, study1_n_oa_DS_v3, n1, n2, "Study 1 - DS r1 vs DS v3"),
-        analyze_proportion_comparison(study1_n_tb_DS_r1, study1_n_tb_DS_v3, n1, n2, "Study 1 - DS r1 vs DS v3"),
-    ] 
+    # Study proportions as parallel arrays (reasoning model vs non-reasoning
+    # model within each firm), one entry per comparison, for overall
+    # accuracy (oa) and truth bias (tb)
+    study1_labels = [
+        "Study 1 - OAI o3 vs OAI 41 (oa)",
+        "Study 1 - OAI o3 vs OAI 41 (tb)",
+        "Study 1 - ANT 37 vs ANT 35 (oa)",
+        "Study 1 - ANT 37 vs ANT 35 (tb)",
+        "Study 1 - DS r1 vs DS v3 (oa)",
+        "Study 1 - DS r1 vs DS v3 (tb)",
+    ]
+    study1_p1 = np.array([0.67, 0.575, 0.695, 0.665, 0.525, 0.925])
+    study1_p2 = np.array([0.545, 0.945, 0.625, 0.795, 0.54, 0.6])
+
+    study2_labels = [
+        "Study 2 - OAI o3 vs OAI 41 (oa)",
+        "Study 2 - OAI o3 vs OAI 41 (tb)",
+        "Study 2 - ANT 37 vs ANT 35 (oa)",
+        "Study 2 - ANT 37 vs ANT 35 (tb)",
+        "Study 2 - DS r1 vs DS v3 (oa)",
+        "Study 2 - DS r1 vs DS v3 (tb)",
+    ]
+    study2_p1 = np.array([0.745, 0.575, 0.595, 0.29, 0.61, 0.69])
+    study2_p2 = np.array([0.55, 0.93, 0.625, 0.795, 0.505, 0.535])
+
+    study3_labels = [
+        "Study 3 - OAI o3 vs OAI 41 (oa)",
+        "Study 3 - OAI o3 vs OAI 41 (tb)",
+        "Study 3 - ANT 37 vs ANT 35 (oa)",
+        "Study 3 - ANT 37 vs ANT 35 (tb)",
+        "Study 3 - DS r1 vs DS v3 (oa)",
+        "Study 3 - DS r1 vs DS v3 (tb)",
+    ]
+    study3_p1 = np.array([0.67, 0.565, 0.63, 0.39, 0.565, 0.745])
+    study3_p2 = np.array([0.62, 0.85, 0.555, 0.555, 0.525, 0.525])
+
+    # Run the Study 1 analysis in one vectorized call
+    batch = proportion_compare_batch(study1_p1, study1_p2, n1, n2, study1_labels, rounded=False)
+    results = batch_to_rows(batch)
 
     for r in results:
         print_results(r)
 
-   # print_results(results1)
-   # print_results(results2, results3, results4, results5, results6, results7)
-   # print_results(results3)
-
     # APA table
-    all_results = [results]
-    apa_table = create_apa_table(all_results)
-
     print("\n--- APA-Style Results Table ---")
-    print(apa_table.to_string(index=False))
\ No newline at end of file
+    print(apa_table_string(format_apa_rows(results)))
\ No newline at end of file
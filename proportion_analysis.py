@@ -1,56 +1,36 @@
+import csv
 import numpy as np
-import scipy.stats as stats
 import pandas as pd
-from math import sqrt
 import os
 
+from stats_kernels import (proportion_compare, proportion_compare_batch,
+                           batch_to_rows, format_p_value, apa_table_string)
+
 
 def analyze_proportion_comparison(p1, p2, n1, n2, study_name=""):
     """
     Analyze the comparison between two proportions with comprehensive statistics.
+
+    Thin wrapper around the shared kernel in stats_kernels; this script works
+    from counts rounded to integers, as the proportions come from data.
     """
+    return proportion_compare(p1, p2, n1, n2, study_name, rounded=True)
+
 
-    # Compute counts
-    count1 = int(round(p1 * n1))
-    count2 = int(round(p2 * n2))
-    fail1 = n1 - count1
-    fail2 = n2 - count2
-
-    # Z-test and confidence interval
-    pooled_p = (count1 + count2) / (n1 + n2)
-    pooled_se = sqrt(pooled_p * (1 - pooled_p) * (1 / n1 + 1 / n2))
-    z_stat = (p1 - p2) / pooled_se
-    p_value_z = 2 * (1 - stats.norm.cdf(abs(z_stat)))
-    z_critical = 1.96
-    z_ci_lower = (p1 - p2) - z_critical * pooled_se
-    z_ci_upper = (p1 - p2) + z_critical * pooled_se
-
-    # Cohen's h
-    cohens_h = 2 * (np.arcsin(np.sqrt(p1)) - np.arcsin(np.sqrt(p2)))
-
-    # Effect size interpretation
-    effect_size_thresholds = [(0.2, "Negligible"), (0.5, "Small"), (0.8, "Medium"), (float('inf'), "Large")]
-    abs_h = abs(cohens_h)
-    effect_size = next((desc for threshold, desc in effect_size_thresholds if abs_h < threshold), "Large")
-
-    # Chi-square test with proper counts
-    obs = np.array([[count1, fail1], [count2, fail2]])
-    chi2, p_chi2, _, _ = stats.chi2_contingency(obs, correction=False)
-
-    return {
-        "study": study_name,
-        "group1_prop": p1,
-        "group2_prop": p2,
-        "difference": p1 - p2,
-        "z_statistic": z_stat,
-        "p_value_z": p_value_z,
-        "z_ci_lower": z_ci_lower,
-        "z_ci_upper": z_ci_upper,
-        "cohens_h": cohens_h,
-        "effect_size": effect_size,
-        "chi_square": chi2,
-        "p_value_chi2": p_chi2
-    }
+def analyze_proportion_comparison_batch(p1, p2, n1, n2, study_names):
+    """
+    Vectorized version of analyze_proportion_comparison for many comparisons.
+    See stats_kernels.proportion_compare_batch.
+    """
+    return proportion_compare_batch(p1, p2, n1, n2, study_names, rounded=True)
+
+
+def batch_results_to_rows(batch):
+    """
+    Expand the dict-of-arrays returned by the batch analyzer into the
+    per-comparison result dicts used by print_results and create_apa_table.
+    """
+    return batch_to_rows(batch)
 
 
 def print_results(results):
@@ -69,30 +49,10 @@ def print_results(results):
     print(f"Chi-square p-value: {results['p_value_chi2']:.6f}")
 
 
-def create_apa_table(results_list):
+def format_apa_rows(results_list):
     """
-    Create a dataframe with APA-style formatting of results
-
-    Parameters:
-    -----------
-    results_list : list
-        List of result dictionaries
-
-    Returns:
-    --------
-    pandas.DataFrame
-        DataFrame with APA-style results
+    Format results as a list of APA-style row dicts (all values strings).
     """
-    def format_p_value(p):
-        if p < 0.001:
-            return "p < .001"
-        elif p < 0.01:
-            return "p < .01"
-        elif p < 0.05:
-            return "p < .05"
-        else:
-            return f"p = {p:.3f}"
-
     apa_results = []
 
     for r in results_list:
@@ -111,9 +71,73 @@ def create_apa_table(results_list):
         }
         apa_results.append(apa_row)
 
-    return pd.DataFrame(apa_results)
+    return apa_results
+
+
+def write_apa_csv(results_list, path):
+    """
+    Save the APA-style table to CSV with csv.DictWriter, without pandas.
+    """
+    rows = format_apa_rows(results_list)
+    if not rows:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def create_apa_table(results_list):
+    """
+    Create a dataframe with APA-style formatting of results
+
+    Parameters:
+    -----------
+    results_list : list
+        List of result dictionaries
+
+    Returns:
+    --------
+    pandas.DataFrame
+        DataFrame with APA-style results
+    """
+    return pd.DataFrame(format_apa_rows(results_list))
+
 
 
+def _load_metrics(csv_path):
+    """
+    Load the metrics table, preferring a parquet cache next to the CSV.
+
+    The first run parses the CSV, forward-fills the study column, and writes
+    a parquet copy; later runs read the parquet directly, which skips both
+    the CSV parse and the preprocessing. Falls back to plain CSV reading if
+    no parquet engine (pyarrow) is installed.
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        try:
+            df = pd.read_parquet(parquet_path)
+        except ImportError:
+            pass
+        else:
+            print(f"Reading cached data from {parquet_path}...")
+            return df
+
+    print(f"Reading data from {csv_path}...")
+    df = pd.read_csv(csv_path)
+
+    # Fill empty study values with previous non-empty value
+    df['study'] = df['study'].ffill()
+
+    try:
+        df.to_parquet(parquet_path)
+    except ImportError:
+        pass
+
+    return df
+
 
 def compare_reasoning_non_reasoning_by_firm(csv_path, n1=200, n2=200):
     """
@@ -137,67 +161,47 @@ def compare_reasoning_non_reasoning_by_firm(csv_path, n1=200, n2=200):
         print(f"Current working directory: {os.getcwd()}")
         print(f"Files in current directory: {os.listdir('.')}")
         return []
-        
-    # Read the CSV file
-    print(f"Reading data from {csv_path}...")
-    df = pd.read_csv(csv_path)
+
+    df = _load_metrics(csv_path)
     print(f"Data loaded successfully. Found {len(df)} rows.")
-    
+
     # Display dataframe info
     print("\nDataframe preview:")
     print(df.head())
     print("\nDataframe columns:", df.columns.tolist())
-    
-    # Fill empty study values with previous non-empty value
-    df['study'] = df['study'].fillna(method='ffill')
-    
-    # Initialize results list
+
+    print(f"\nFound {df['study'].nunique()} studies: {df['study'].unique()}")
+    print(f"Found {df['firm'].nunique()} firms: {df['firm'].unique()}")
+
+    # One C-level pivot aligns the reasoning and non-reasoning rows per
+    # (study, firm), replacing the per-group, per-metric scalar extraction
+    piv = df.pivot_table(index=['study', 'firm'], columns='capability',
+                         values=['overall_accuracy', 'truth_bias', 'model'],
+                         aggfunc='first', sort=False)
+
+    # Keep only pairs that have both a reasoning and a non-reasoning row
+    complete = piv.notna().all(axis=1)
+    for study, firm in piv.index[~complete]:
+        print(f"Missing either reasoning or non-reasoning data for {study} - {firm}")
+    piv = piv[complete]
+
     results = []
-    
-    # Get unique studies and firms
-    studies = df['study'].unique()
-    firms = df['firm'].unique()
-    
-    print(f"\nFound {len(studies)} studies: {studies}")
-    print(f"Found {len(firms)} firms: {firms}")
-    
-    # For each study and firm
-    for study in studies:
-        for firm in firms:
-            study_firm_df = df[(df['study'] == study) & (df['firm'] == firm)]
-            
-            print(f"\nAnalyzing {study} - {firm}. Found {len(study_firm_df)} rows.")
-            
-            # Check if we have both reasoning and non-reasoning data
-            if len(study_firm_df) >= 2:
-                reasoning_row = study_firm_df[study_firm_df['capability'] == 'reasoning']
-                non_reasoning_row = study_firm_df[study_firm_df['capability'] == 'non-reasoning']
-                
-                print(f"  Reasoning rows: {len(reasoning_row)}")
-                print(f"  Non-reasoning rows: {len(non_reasoning_row)}")
-                
-                # Make sure we have both types
-                if len(reasoning_row) > 0 and len(non_reasoning_row) > 0:
-                    # Get values for both metrics
-                    for metric in ['overall_accuracy', 'truth_bias']:
-                        r_value = reasoning_row[metric].values[0]
-                        nr_value = non_reasoning_row[metric].values[0]
-                        
-                        print(f"  Comparing {metric}: {r_value} vs {nr_value}")
-                        
-                        # Construct study name
-                        r_model = reasoning_row['model'].values[0]
-                        nr_model = non_reasoning_row['model'].values[0]
-                        study_name = f"{study}: {firm} ({r_model} vs {nr_model}) - {metric}"
-                        
-                        # Analyze comparison
-                        result = analyze_proportion_comparison(r_value, nr_value, n1, n2, study_name)
-                        results.append(result)
-                else:
-                    print(f"  Missing either reasoning or non-reasoning data for {study} - {firm}")
-            else:
-                print(f"  Not enough data for {study} - {firm}")
-    
+    if len(piv):
+        pair_names = [f"{study}: {firm} ({r_model} vs {nr_model})"
+                      for (study, firm), r_model, nr_model
+                      in zip(piv.index, piv[('model', 'reasoning')], piv[('model', 'non-reasoning')])]
+
+        # Interleave the two metrics so each pair reports overall accuracy
+        # then truth bias, matching the original per-group ordering
+        metrics = ['overall_accuracy', 'truth_bias']
+        p1_values = np.column_stack([piv[(m, 'reasoning')].to_numpy(dtype=float) for m in metrics]).ravel()
+        p2_values = np.column_stack([piv[(m, 'non-reasoning')].to_numpy(dtype=float) for m in metrics]).ravel()
+        study_names = [f"{name} - {metric}" for name in pair_names for metric in metrics]
+
+        # Analyze all comparisons in one vectorized call
+        batch = analyze_proportion_comparison_batch(p1_values, p2_values, n1, n2, study_names)
+        results = batch_results_to_rows(batch)
+
     print(f"\nTotal comparisons made: {len(results)}")
     return results
 
@@ -242,12 +246,11 @@ if __name__ == "__main__":
             
             # Create and print APA table
             print("\n--- APA-Style Results Table ---")
-            apa_table = create_apa_table(results)
-            print(apa_table.to_string(index=False))
-            
+            print(apa_table_string(format_apa_rows(results)))
+
             # Save results to file
             output_file = "proportion_comparison_results-v5.csv"
-            apa_table.to_csv(output_file, index=False)
+            write_apa_csv(results, output_file)
             print(f"\nResults saved to '{output_file}'")
             print(f"Full path: {os.path.join(os.getcwd(), output_file)}")
         else:
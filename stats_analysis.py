@@ -1,92 +1,137 @@
+import math
+import statistics
+
 import numpy as np
-from scipy.stats import ttest_rel, wilcoxon
-from statsmodels.stats.multitest import multipletests
+from scipy.stats import wilcoxon
+from scipy.special import stdtr
+
+# All of the paired statistics below are functions of the difference vector
+# alone, so the *_from_diff forms take a precomputed diff and the two-array
+# wrappers just build it once.
+
+# Paired t-test inline: on these length-8 arrays scipy.stats.ttest_rel's
+# dispatch and validation dominate the arithmetic; stdtr is the Student's-t
+# CDF without the rv_continuous machinery
+def paired_t_from_diff(diff):
+    n = len(diff)
+    m = statistics.fmean(diff)
+    var = sum((v - m) ** 2 for v in diff) / (n - 1)
+    t = m / math.sqrt(var / n)
+    p = 2 * stdtr(n - 1, -abs(t))
+    return t, p
+
+def paired_t(x, y):
+    return paired_t_from_diff([a - b for a, b in zip(x, y)])
 
 # Define Cohen's d for paired samples
+def cohen_d_from_diff(diff):
+    # Plain-math reduction: on these tiny arrays numpy's dispatch and
+    # allocation cost more than the arithmetic itself
+    m = statistics.fmean(diff)
+    var = sum((v - m) ** 2 for v in diff) / (len(diff) - 1)
+    return m / math.sqrt(var)
+
 def cohen_d(x, y):
-    diff = x - y
-    return np.mean(diff) / np.std(diff, ddof=1)
+    return cohen_d_from_diff([a - b for a, b in zip(x, y)])
 
 # Define Rank-Biserial correlation for Wilcoxon signed-rank test
+def rank_biserial_from_diff(diff):
+    # sign-sum gives (positives - negatives) and count_nonzero gives their
+    # total, so one pass over diff replaces the two comparison scans
+    num = float(np.sign(diff).sum())
+    n = int(np.count_nonzero(diff))
+    return num / n if n else 0.0
+
 def rank_biserial(x, y):
-    diff = x - y
-    positive_ranks = np.sum(diff > 0)
-    negative_ranks = np.sum(diff < 0)
-    n = positive_ranks + negative_ranks
-    if n == 0:
-        return 0.0
-    return (positive_ranks - negative_ranks) / n
-
-# Data for each condition
+    return rank_biserial_from_diff(x - y)
+
+# Data for each condition, as rows of one (3, 8) matrix
 neutral = np.array([57.5, 94.0, 66.5, 92.5, 94.5, 79.5, 60.0, 99.36])
 veracity = np.array([49.5, 95.0, 29.0, 69.0, 93.0, 65.5, 53.5, 97.16])
 base_rate = np.array([56.5, 76.5, 39.0, 74.5, 85.0, 55.5, 52.5, 66.67])
 
-# Paired t-tests
-ttest_neutral_vs_veracity = ttest_rel(neutral, veracity)
-ttest_neutral_vs_base = ttest_rel(neutral, base_rate)
-ttest_base_vs_veracity = ttest_rel(base_rate, veracity)
-
-# Cohen's d values
-d_neutral_vs_veracity = cohen_d(neutral, veracity)
-d_neutral_vs_base = cohen_d(neutral, base_rate)
-d_base_vs_veracity = cohen_d(base_rate, veracity)
-
-# Print t-test and Cohen's d results
-print("=== Paired t-tests ===")
-print(f"Neutral vs Veracity: t={ttest_neutral_vs_veracity.statistic:.4f}, p={ttest_neutral_vs_veracity.pvalue:.4f}, d={d_neutral_vs_veracity:.4f}")
-print(f"Neutral vs Base-Rate: t={ttest_neutral_vs_base.statistic:.4f}, p={ttest_neutral_vs_base.pvalue:.4f}, d={d_neutral_vs_base:.4f}")
-print(f"Base-Rate vs Veracity: t={ttest_base_vs_veracity.statistic:.4f}, p={ttest_base_vs_veracity.pvalue:.4f}, d={d_base_vs_veracity:.4f}")
-
-# Wilcoxon signed-rank tests
-wilcoxon_results = {
-    'neutral_vs_veracity': (neutral, veracity),
-    'neutral_vs_base_rate': (neutral, base_rate),
-    'veracity_vs_base_rate': (veracity, base_rate)
-}
-
-wilcoxon_outputs = {}
-p_values = []
-
-print("\n=== Wilcoxon Tests ===")
-for name, (x, y) in wilcoxon_results.items():
-    result = wilcoxon(x, y)
-    rb = rank_biserial(x, y)
-    wilcoxon_outputs[name] = (result, rb)
-    p_values.append(result.pvalue)
-    print(f"{name}: statistic={result.statistic:.4f}, p={result.pvalue:.4f}, rank-biserial={rb:.4f}")
-
-# Multiple comparisons correction (Bonferroni)
-corrected = multipletests(p_values, method='bonferroni')
-
-print("\n=== Bonferroni Corrected Wilcoxon p-values ===")
-for i, name in enumerate(wilcoxon_outputs.keys()):
-    print(f"{name}: corrected p={corrected[1][i]:.4f}, significant={corrected[0][i]}")
-
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-
-# Prepare data for plotting
-data = pd.DataFrame({
-    'Neutral': neutral,
-    'Veracity': veracity,
-    'Base-Rate': base_rate
-})
-
-# Melt the dataframe for seaborn
-data_melted = data.melt(var_name='Condition', value_name='Score')
-
-# Set plot style
-sns.set(style="whitegrid")
-
-# Create boxplot
-plt.figure(figsize=(8, 6))
-sns.boxplot(x='Condition', y='Score', data=data_melted, palette='Set2')
-sns.swarmplot(x='Condition', y='Score', data=data_melted, color='black', alpha=0.6)
-
-plt.title("Score Distributions by Condition")
-plt.ylabel("Score")
-plt.xlabel("Condition")
-plt.tight_layout()
-plt.show()
+M = np.array([neutral, veracity, base_rate])
+
+
+if __name__ == "__main__":
+    # Each pairwise difference is computed once and reused by the paired
+    # t-test, Cohen's d, Wilcoxon, and the rank-biserial correlation
+    diffs = {
+        'neutral_vs_veracity': M[0] - M[1],
+        'neutral_vs_base_rate': M[0] - M[2],
+        'base_rate_vs_veracity': M[2] - M[1],
+    }
+
+    # Paired t-tests
+    ttest_neutral_vs_veracity = paired_t_from_diff(diffs['neutral_vs_veracity'])
+    ttest_neutral_vs_base = paired_t_from_diff(diffs['neutral_vs_base_rate'])
+    ttest_base_vs_veracity = paired_t_from_diff(diffs['base_rate_vs_veracity'])
+
+    # Cohen's d values
+    d_neutral_vs_veracity = cohen_d_from_diff(diffs['neutral_vs_veracity'])
+    d_neutral_vs_base = cohen_d_from_diff(diffs['neutral_vs_base_rate'])
+    d_base_vs_veracity = cohen_d_from_diff(diffs['base_rate_vs_veracity'])
+
+    # Print t-test and Cohen's d results
+    print("=== Paired t-tests ===")
+    print(f"Neutral vs Veracity: t={ttest_neutral_vs_veracity[0]:.4f}, p={ttest_neutral_vs_veracity[1]:.4f}, d={d_neutral_vs_veracity:.4f}")
+    print(f"Neutral vs Base-Rate: t={ttest_neutral_vs_base[0]:.4f}, p={ttest_neutral_vs_base[1]:.4f}, d={d_neutral_vs_base:.4f}")
+    print(f"Base-Rate vs Veracity: t={ttest_base_vs_veracity[0]:.4f}, p={ttest_base_vs_veracity[1]:.4f}, d={d_base_vs_veracity:.4f}")
+
+    # Wilcoxon signed-rank tests on the same difference vectors (the third
+    # comparison is reported in the opposite orientation, hence the sign flip)
+    wilcoxon_diffs = {
+        'neutral_vs_veracity': diffs['neutral_vs_veracity'],
+        'neutral_vs_base_rate': diffs['neutral_vs_base_rate'],
+        'veracity_vs_base_rate': -diffs['base_rate_vs_veracity'],
+    }
+
+    wilcoxon_outputs = {}
+    p_values = []
+
+    print("\n=== Wilcoxon Tests ===")
+    for name, d in wilcoxon_diffs.items():
+        result = wilcoxon(d)
+        rb = rank_biserial_from_diff(d)
+        wilcoxon_outputs[name] = (result, rb)
+        p_values.append(result.pvalue)
+        print(f"{name}: statistic={result.statistic:.4f}, p={result.pvalue:.4f}, rank-biserial={rb:.4f}")
+
+    # Multiple comparisons correction (Bonferroni): just min(p * k, 1)
+    p_arr = np.array(p_values)
+    corrected_p = np.minimum(p_arr * len(p_arr), 1.0)
+    significant = corrected_p < 0.05
+
+    print("\n=== Bonferroni Corrected Wilcoxon p-values ===")
+    for i, name in enumerate(wilcoxon_outputs.keys()):
+        print(f"{name}: corrected p={corrected_p[i]:.4f}, significant={significant[i]}")
+
+    # Plotting: matplotlib/seaborn/pandas are imported lazily so importing
+    # this module for the test helpers does not pay their startup cost
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import pandas as pd
+
+    # Prepare data for plotting
+    data = pd.DataFrame({
+        'Neutral': neutral,
+        'Veracity': veracity,
+        'Base-Rate': base_rate
+    })
+
+    # Melt the dataframe for seaborn
+    data_melted = data.melt(var_name='Condition', value_name='Score')
+
+    # Set plot style
+    sns.set(style="whitegrid")
+
+    # Create boxplot
+    plt.figure(figsize=(8, 6))
+    sns.boxplot(x='Condition', y='Score', data=data_melted, palette='Set2')
+    sns.swarmplot(x='Condition', y='Score', data=data_melted, color='black', alpha=0.6)
+
+    plt.title("Score Distributions by Condition")
+    plt.ylabel("Score")
+    plt.xlabel("Condition")
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,296 @@
+import bisect
+import functools
+import math
+import numpy as np
+import scipy.special as special
+from math import sqrt, erfc
+
+# Precomputed once: erfc(|z| / sqrt(2)) is the two-sided normal tail probability
+_SQRT2 = sqrt(2.0)
+
+# Normal critical values, resolved once at import instead of per comparison;
+# ndtri(0.975) is the full-precision 1.959963984540054 rather than 1.96
+_Z95 = special.ndtri(0.975)
+_Z_CRIT_CACHE = {0.05: _Z95}
+
+
+def _z_crit(alpha):
+    """
+    Memoized two-sided normal critical value for a given alpha, so callers
+    requesting non-default confidence levels pay the ndtri call once.
+    """
+    z = _Z_CRIT_CACHE.get(alpha)
+    if z is None:
+        z = _Z_CRIT_CACHE[alpha] = special.ndtri(1 - alpha / 2)
+    return z
+
+# Cohen's h effect-size buckets (Cohen 1988)
+_EFFECT_THRESHOLDS = (0.2, 0.5, 0.8)
+_EFFECT_LABELS = ("Negligible", "Small", "Medium", "Large")
+
+
+@functools.lru_cache(maxsize=None)
+def _phi(p):
+    """
+    Memoized arcsine-square-root transform used by Cohen's h.
+
+    The scripts draw proportions from a small fixed set of values, so after
+    the first pass each transcendental pair (sqrt + asin) becomes a cache
+    lookup.
+    """
+    return 2 * math.asin(math.sqrt(p))
+
+
+def _stats_kernel(p1, p2, count1, count2, n1, n2, inv_sum_n):
+    """
+    Pure-arithmetic core: z statistic, pooled SE, and the closed-form 2x2
+    chi-square. Compiled with numba when available so the whole inner
+    computation is one JIT call; Cohen's h and the p-values are computed by
+    the caller (math.erfc and the memoized _phi transform). inv_sum_n is
+    the precomputed 1/n1 + 1/n2, shared by callers holding the sample
+    sizes fixed.
+    """
+    fail1 = n1 - count1
+    fail2 = n2 - count2
+
+    pooled_p = (count1 + count2) / (n1 + n2)
+    pooled_se = math.sqrt(pooled_p * (1 - pooled_p) * inv_sum_n)
+    z_stat = (p1 - p2) / pooled_se
+
+    # Closed form for a 2x2 table, equivalent to
+    # stats.chi2_contingency(obs, correction=False)
+    N = n1 + n2
+    den = (count1 + fail1) * (count2 + fail2) * (count1 + count2) * (fail1 + fail2)
+    chi2 = N * (count1 * fail2 - fail1 * count2) ** 2 / den if den else 0.0
+
+    return z_stat, pooled_se, chi2
+
+
+try:
+    from numba import njit
+    _stats_kernel = njit(fastmath=True, cache=True)(_stats_kernel)
+except ImportError:
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _proportion_compare_cached(p1, p2, n1, n2, rounded, welch):
+    """
+    Numeric core of proportion_compare, memoized on its inputs.
+
+    The proportions used by the analysis scripts are drawn from a small
+    fixed set of values, so repeated comparisons hit the cache and cost a
+    dict lookup instead of recomputing the statistics.
+    """
+    if rounded:
+        # Work from integer counts, as when the proportions came from data
+        count1 = float(round(p1 * n1))
+        count2 = float(round(p2 * n2))
+    else:
+        count1 = p1 * n1
+        count2 = p2 * n2
+
+    z_stat, pooled_se, chi2 = _stats_kernel(
+        float(p1), float(p2), count1, count2, float(n1), float(n2),
+        1.0 / n1 + 1.0 / n2)
+
+    # Cohen's h from the memoized per-proportion transforms
+    cohens_h = _phi(p1) - _phi(p2)
+
+    # Tail probabilities, computed outside the kernel with libm
+    p_value_z = erfc(abs(z_stat) / _SQRT2)
+    p_chi2 = erfc(sqrt(chi2 / 2))
+
+    z_critical = _Z95
+    z_ci_lower = (p1 - p2) - z_critical * pooled_se
+    z_ci_upper = (p1 - p2) + z_critical * pooled_se
+
+    # Effect size interpretation
+    effect_size = _EFFECT_LABELS[bisect.bisect_right(_EFFECT_THRESHOLDS, abs(cohens_h))]
+
+    result = {
+        "group1_prop": p1,
+        "group2_prop": p2,
+        "difference": p1 - p2,
+        "z_statistic": z_stat,
+        "p_value_z": p_value_z,
+        "z_ci_lower": z_ci_lower,
+        "z_ci_upper": z_ci_upper,
+        "cohens_h": cohens_h,
+        "effect_size": effect_size,
+        "chi_square": chi2,
+        "p_value_chi2": p_chi2
+    }
+
+    if welch:
+        # Welch's t-test on the unpooled proportion variances; stdtr is the
+        # Student's-t CDF without the rv_continuous dispatch layer
+        from scipy.special import stdtr
+        var1 = p1 * (1 - p1) / n1
+        var2 = p2 * (1 - p2) / n2
+        var_sum = var1 + var2
+        se_diff = sqrt(var_sum)
+        t_stat = (p1 - p2) / se_diff
+        df = (var_sum * var_sum) / (var1 * var1 / (n1 - 1) + var2 * var2 / (n2 - 1))
+        result["t_statistic"] = t_stat
+        result["df"] = df
+        result["p_value_t"] = 2 * stdtr(df, -abs(t_stat))
+
+    return result
+
+
+def proportion_compare(p1, p2, n1, n2, study_name="", *, rounded=True, welch=False):
+    """
+    Analyze the comparison between two proportions with comprehensive statistics.
+
+    Single shared implementation of the proportion-comparison kernel used by
+    the analysis scripts (new_analysis.py, proportion_analysis.py).
+
+    Parameters:
+    -----------
+    p1, p2 : float
+        The proportions for group 1 and group 2 (between 0 and 1)
+    n1, n2 : int
+        The sample sizes for group 1 and group 2
+    study_name : str
+        Optional name for the study
+    rounded : bool
+        If True, round p*n to integer counts before computing the pooled
+        proportion and the chi-square table
+    welch : bool
+        If True, additionally report Welch's t-test on the unpooled variances
+
+    Returns:
+    --------
+    dict
+        Dictionary containing all calculated statistics
+    """
+    result = {"study": study_name}
+    result.update(_proportion_compare_cached(p1, p2, n1, n2, rounded, welch))
+    return result
+
+
+def proportion_compare_batch(p1, p2, n1, n2, study_names, *, rounded=True,
+                            phi1=None, phi2=None):
+    """
+    Vectorized version of proportion_compare for many comparisons.
+
+    Computes all statistics elementwise on NumPy arrays, so the Python and
+    scipy call overhead is paid once for the whole batch instead of once per
+    comparison.
+
+    Parameters:
+    -----------
+    p1, p2 : array-like
+        Proportions for group 1 and group 2 (between 0 and 1)
+    n1, n2 : int or array-like
+        Sample sizes for both groups
+    study_names : list of str
+        One name per comparison
+    rounded : bool
+        If True, round p*n to integer counts before computing the pooled
+        proportion and the chi-square table
+    phi1, phi2 : array-like, optional
+        Precomputed asin(sqrt(p)) transforms for each group; callers that
+        reuse the same proportions across many pairs pass these so the
+        transcendentals are computed once per proportion rather than once
+        per pair
+
+    Returns:
+    --------
+    dict
+        Dictionary of arrays, one entry per statistic
+    """
+    p1 = np.asarray(p1, dtype=float)
+    p2 = np.asarray(p2, dtype=float)
+    n1 = np.asarray(n1, dtype=float)
+    n2 = np.asarray(n2, dtype=float)
+    # The sample-size term is computed before broadcasting, so a scalar n
+    # yields one scalar shared across the whole batch
+    inv_sum_n = 1.0 / n1 + 1.0 / n2
+    n1 = np.broadcast_to(n1, p1.shape)
+    n2 = np.broadcast_to(n2, p2.shape)
+
+    if rounded:
+        count1 = np.rint(p1 * n1)
+        count2 = np.rint(p2 * n2)
+    else:
+        count1 = p1 * n1
+        count2 = p2 * n2
+    fail1 = n1 - count1
+    fail2 = n2 - count2
+
+    # Z-test and confidence interval
+    pooled_p = (count1 + count2) / (n1 + n2)
+    pooled_se = np.sqrt(pooled_p * (1 - pooled_p) * inv_sum_n)
+    z_stat = (p1 - p2) / pooled_se
+    p_value_z = special.erfc(np.abs(z_stat) / _SQRT2)
+    z_critical = _Z95
+    z_ci_lower = (p1 - p2) - z_critical * pooled_se
+    z_ci_upper = (p1 - p2) + z_critical * pooled_se
+
+    # Cohen's h and effect size labels
+    if phi1 is not None and phi2 is not None:
+        cohens_h = 2 * (np.asarray(phi1, dtype=float) - np.asarray(phi2, dtype=float))
+    else:
+        cohens_h = 2 * (np.arcsin(np.sqrt(p1)) - np.arcsin(np.sqrt(p2)))
+    effect_size = np.array(_EFFECT_LABELS)[np.searchsorted(_EFFECT_THRESHOLDS, np.abs(cohens_h), side='right')]
+
+    # 2x2 chi-square via the closed form; chi2(1) survival = gammaincc(1/2, x/2)
+    N = n1 + n2
+    den = (count1 + fail1) * (count2 + fail2) * (count1 + count2) * (fail1 + fail2)
+    chi2 = np.where(den > 0, N * (count1 * fail2 - fail1 * count2) ** 2 / np.where(den > 0, den, 1), 0.0)
+    p_chi2 = special.gammaincc(0.5, chi2 / 2)
+
+    return {
+        "study": list(study_names),
+        "group1_prop": p1,
+        "group2_prop": p2,
+        "difference": p1 - p2,
+        "z_statistic": z_stat,
+        "p_value_z": p_value_z,
+        "z_ci_lower": z_ci_lower,
+        "z_ci_upper": z_ci_upper,
+        "cohens_h": cohens_h,
+        "effect_size": effect_size,
+        "chi_square": chi2,
+        "p_value_chi2": p_chi2
+    }
+
+
+def batch_to_rows(batch):
+    """
+    Expand the dict-of-arrays returned by proportion_compare_batch into the
+    per-comparison result dicts used by the printing helpers.
+    """
+    keys = list(batch.keys())
+    return [dict(zip(keys, row)) for row in zip(*(batch[k] for k in keys))]
+
+
+def format_p_value(p):
+    """
+    APA-style p-value string, shared by the analysis scripts' tables.
+    """
+    if p < 0.001:
+        return "p < .001"
+    elif p < 0.01:
+        return "p < .01"
+    elif p < 0.05:
+        return "p < .05"
+    else:
+        return f"p = {p:.3f}"
+
+
+def apa_table_string(rows):
+    """
+    Render APA-style row dicts (as produced by the scripts' format_apa_rows
+    helpers) as aligned plain text, without pandas.
+    """
+    if not rows:
+        return ""
+    fieldnames = list(rows[0].keys())
+    widths = {name: max(len(name), *(len(row[name]) for row in rows)) for name in fieldnames}
+    lines = ["  ".join(name.rjust(widths[name]) for name in fieldnames)]
+    for row in rows:
+        lines.append("  ".join(row[name].rjust(widths[name]) for name in fieldnames))
+    return "\n".join(lines)
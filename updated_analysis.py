@@ -1,13 +1,118 @@
+import itertools
+
 import numpy as np
-import scipy.stats as stats
 import pandas as pd
-from math import sqrt
+from math import asin, sqrt
+from typing import NamedTuple
+
+from stats_kernels import format_p_value, proportion_compare, proportion_compare_batch
+
+
+class ProportionResult(NamedTuple):
+    """
+    One proportion comparison's statistics.
+
+    A named tuple instead of a dict: one flat allocation per comparison,
+    attribute access in the printing/formatting paths, and hashable so
+    results can flow through caches unchanged.
+    """
+    study: str
+    group1_prop: float
+    group2_prop: float
+    difference: float
+    z_statistic: float
+    p_value_z: float
+    z_ci_lower: float
+    z_ci_upper: float
+    cohens_h: float
+    effect_size: str
+    chi_square: float
+    p_value_chi2: float
+
+
+class ResultsTable:
+    """
+    Structure-of-arrays container for a batch of proportion comparisons.
+
+    Each statistic lives in one NumPy array, so the batch analyzer stores
+    its arrays directly instead of materializing a tuple per row, and the
+    table builders format whole columns at a time. Rows are materialized
+    lazily as ProportionResult for the printing path.
+    """
+    _fields = ProportionResult._fields
+    __slots__ = _fields
+
+    def __init__(self, **columns):
+        for name in self._fields:
+            setattr(self, name, np.asarray(columns[name]))
+
+    @classmethod
+    def from_rows(cls, rows):
+        rows = list(rows)
+        return cls(**{name: [getattr(r, name) for r in rows] for name in cls._fields})
+
+    def __len__(self):
+        return len(self.study)
+
+    def row(self, i):
+        return ProportionResult(*(getattr(self, name)[i] for name in self._fields))
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self)))
+
+    def take(self, indices, study=None):
+        """
+        Select rows by index into a new table, optionally renaming the
+        studies; used by run_comparison_set to fan deduplicated results
+        back out with one fancy-indexing pass per column.
+        """
+        indices = np.asarray(indices)
+        columns = {name: getattr(self, name)[indices] for name in self._fields}
+        if study is not None:
+            columns["study"] = np.asarray(study, dtype=object)
+        return type(self)(**columns)
+
+
+def analyze_proportion_comparison_batch(p1, p2, n1, n2, study_names, phi1=None, phi2=None):
+    """
+    Vectorized analyze_proportion_comparison over K comparisons at once.
+
+    Thin wrapper around the shared kernel in stats_kernels: all statistics
+    are computed elementwise on NumPy arrays with each scipy special
+    function called once per batch, and the kernel's columns are stored
+    directly in a ResultsTable.
+
+    Parameters:
+    -----------
+    p1, p2 : array-like
+        Proportions for group 1 and group 2 (between 0 and 1)
+    n1, n2 : int
+        Sample sizes for both groups
+    study_names : list of str
+        One name per comparison
+    phi1, phi2 : array-like, optional
+        Precomputed asin(sqrt(p)) transforms for each group; callers that
+        reuse the same proportions across many pairs (run_comparison_set)
+        pass these so the transcendentals are computed once per proportion
+        rather than once per pair
+
+    Returns:
+    --------
+    ResultsTable
+        Columnar table of results, one row per comparison
+    """
+    return ResultsTable(**proportion_compare_batch(
+        p1, p2, n1, n2, study_names, rounded=False, phi1=phi1, phi2=phi2))
 
 
 def analyze_proportion_comparison(p1, p2, n1, n2, study_name=""):
     """
     Analyze the comparison between two proportions with comprehensive statistics.
 
+    Thin wrapper around the shared kernel in stats_kernels; this script
+    works from the exact p*n counts, and the kernel memoizes each
+    comparison on its numeric inputs.
+
     Parameters:
     -----------
     p1, p2 : float
@@ -19,108 +124,113 @@ def analyze_proportion_comparison(p1, p2, n1, n2, study_name=""):
 
     Returns:
     --------
-    dict
-        Dictionary containing all calculated statistics
-    """
-    # Variance and standard error
-    var1 = p1 * (1 - p1) / n1
-    var2 = p2 * (1 - p2) / n2
-    se_diff = sqrt(var1 + var2)
-
-    # Z-test and confidence interval
-    pooled_p = (n1 * p1 + n2 * p2) / (n1 + n2)
-    pooled_se = sqrt(pooled_p * (1 - pooled_p) * (1 / n1 + 1 / n2))
-    z_stat = (p1 - p2) / pooled_se
-    p_value_z = 2 * (1 - stats.norm.cdf(abs(z_stat)))
-    z_critical = 1.96
-    z_ci_lower = (p1 - p2) - z_critical * pooled_se
-    z_ci_upper = (p1 - p2) + z_critical * pooled_se
-
-    # Cohen's h
-    cohens_h = 2 * (np.arcsin(np.sqrt(p1)) - np.arcsin(np.sqrt(p2)))
-
-    # Effect size interpretation
-    effect_size_thresholds = [(0.2, "Negligible"), (0.5, "Small"), (0.8, "Medium"), (float('inf'), "Large")]
-    abs_h = abs(cohens_h)
-    effect_size = next((desc for threshold, desc in effect_size_thresholds if abs_h < threshold), "Large")
-
-    # Chi-square test
-    obs = np.array([[p1 * n1, (1 - p1) * n1], [p2 * n2, (1 - p2) * n2]])
-    chi2, p_chi2, _, _ = stats.chi2_contingency(obs)
-
-    return {
-        "study": study_name,
-        "group1_prop": p1,
-        "group2_prop": p2,
-        "difference": p1 - p2,
-        "z_statistic": z_stat,
-        "p_value_z": p_value_z,
-        "z_ci_lower": z_ci_lower,
-        "z_ci_upper": z_ci_upper,
-        "cohens_h": cohens_h,
-        "effect_size": effect_size,
-        "chi_square": chi2,
-        "p_value_chi2": p_chi2
-    }
+    ProportionResult
+        Named tuple containing all calculated statistics
+    """
+    return ProportionResult(**proportion_compare(p1, p2, n1, n2, study_name, rounded=False))
 
 
 def print_results(results):
     """
     Print the results in a formatted way
     """
-    print(f"\n--- Results for {results['study']} ---")
-    print(f"Group 1 proportion: {results['group1_prop']:.3f}")
-    print(f"Group 2 proportion: {results['group2_prop']:.3f}")
-    print(f"Difference: {results['difference']:.3f}")
-    print(f"\nZ-test statistic: {results['z_statistic']:.3f}")
-    print(f"Z-test p-value: {results['p_value_z']:.6f}")
-    print(f"95% CI for Z-test: [{results['z_ci_lower']:.3f}, {results['z_ci_upper']:.3f}]")
-    print(f"\nCohen's h: {results['cohens_h']:.3f} ({results['effect_size']})")
-    print(f"\nChi-square statistic: {results['chi_square']:.3f}")
-    print(f"Chi-square p-value: {results['p_value_chi2']:.6f}")
+    print(f"\n--- Results for {results.study} ---")
+    print(f"Group 1 proportion: {results.group1_prop:.3f}")
+    print(f"Group 2 proportion: {results.group2_prop:.3f}")
+    print(f"Difference: {results.difference:.3f}")
+    print(f"\nZ-test statistic: {results.z_statistic:.3f}")
+    print(f"Z-test p-value: {results.p_value_z:.6f}")
+    print(f"95% CI for Z-test: [{results.z_ci_lower:.3f}, {results.z_ci_upper:.3f}]")
+    print(f"\nCohen's h: {results.cohens_h:.3f} ({results.effect_size})")
+    print(f"\nChi-square statistic: {results.chi_square:.3f}")
+    print(f"Chi-square p-value: {results.p_value_chi2:.6f}")
 
 
 def create_apa_table(results_list):
     """
     Create a dataframe with APA-style formatting of results
 
+    The numeric fields are pulled into arrays first and formatted as whole
+    columns, so the per-row Python dict construction and per-cell f-string
+    calls are replaced by one vectorized pass per column.
+
     Parameters:
     -----------
-    results_list : list
-        List of result dictionaries
+    results_list : ResultsTable or list of ProportionResult
+        The comparison results to format
 
     Returns:
     --------
     pandas.DataFrame
         DataFrame with APA-style results
     """
-    def format_p_value(p):
-        if p < 0.001:
-            return "p < .001"
-        elif p < 0.01:
-            return "p < .01"
-        elif p < 0.05:
-            return "p < .05"
-        else:
-            return f"p = {p:.3f}"
-
-    apa_results = []
-
-    for r in results_list:
-        apa_row = {
-            "Study": r['study'],
-            "Reasoning (%)": f"{r['group1_prop']*100:.1f}",
-            "Non-reasoning (%)": f"{r['group2_prop']*100:.1f}",
-            "Difference (%)": f"{r['difference']*100:.1f}",
-            "95% CI (diff)": f"[{r['z_ci_lower']*100:.1f}, {r['z_ci_upper']*100:.1f}]",
-            "Z-test": f"z = {r['z_statistic']:.2f}",
-            "p-value": format_p_value(r['p_value_z']),
-            "Cohen's h": f"{r['cohens_h']:.2f}",
-            "Effect size": r['effect_size']
-        }
-        apa_results.append(apa_row)
-
-    return pd.DataFrame(apa_results)
+    table = (results_list if isinstance(results_list, ResultsTable)
+             else ResultsTable.from_rows(results_list))
+
+    ci_lo = pd.Series(np.char.mod("%.1f", table.z_ci_lower * 100))
+    ci_hi = pd.Series(np.char.mod("%.1f", table.z_ci_upper * 100))
+
+    # format_p_value's if-elif chain, as one vectorized pass over the column
+    p = table.p_value_z
+    p_str = np.where(p < 0.001, "p < .001",
+                     np.where(p < 0.01, "p < .01",
+                              np.where(p < 0.05, "p < .05",
+                                       np.char.mod("p = %.3f", p))))
+
+    return pd.DataFrame({
+        "Study": table.study,
+        "Reasoning (%)": np.char.mod("%.1f", table.group1_prop * 100),
+        "Non-reasoning (%)": np.char.mod("%.1f", table.group2_prop * 100),
+        "Difference (%)": np.char.mod("%.1f", table.difference * 100),
+        "95% CI (diff)": "[" + ci_lo + ", " + ci_hi + "]",
+        "Z-test": "z = " + pd.Series(np.char.mod("%.2f", table.z_statistic)),
+        "p-value": p_str,
+        "Cohen's h": np.char.mod("%.2f", table.cohens_h),
+        "Effect size": table.effect_size
+    })
+
+
+def create_apa_table_str(results_list):
+    """
+    Render the APA-style table as aligned plain text, without pandas.
+
+    For the dozen-row tables the script prints, building a DataFrame and
+    calling to_string costs more than the formatting itself; this formats
+    each row once and pads to column widths computed in a single pass.
+
+    Parameters:
+    -----------
+    results_list : ResultsTable or list of ProportionResult
+        The comparison results to format
+
+    Returns:
+    --------
+    str
+        The formatted table, one line per row
+    """
+    if not results_list:
+        return ""
+
+    header = ["Study", "Reasoning (%)", "Non-reasoning (%)", "Difference (%)",
+              "95% CI (diff)", "Z-test", "p-value", "Cohen's h", "Effect size"]
+    rows = [
+        [r.study,
+         f"{r.group1_prop*100:.1f}",
+         f"{r.group2_prop*100:.1f}",
+         f"{r.difference*100:.1f}",
+         f"[{r.z_ci_lower*100:.1f}, {r.z_ci_upper*100:.1f}]",
+         f"z = {r.z_statistic:.2f}",
+         format_p_value(r.p_value_z),
+         f"{r.cohens_h:.2f}",
+         r.effect_size]
+        for r in results_list
+    ]
+
+    widths = [max(len(name), *(len(row[i]) for row in rows)) for i, name in enumerate(header)]
+    lines = [" ".join(name.rjust(w) for name, w in zip(header, widths))]
+    for row in rows:
+        lines.append(" ".join(cell.rjust(w) for cell, w in zip(row, widths)))
+    return "\n".join(lines)
 
 
 def run_comparison_set(data_dict, sample_sizes, comparison_type=None):
@@ -138,38 +248,54 @@ def run_comparison_set(data_dict, sample_sizes, comparison_type=None):
 
     Returns:
     --------
-    list
-        List of result dictionaries
+    ResultsTable
+        Columnar table of results, one row per comparison
     """
     n1, n2 = sample_sizes
-    results = []
-    
-    # Organize comparisons
+
+    # Each model's proportions appear in every pair it participates in, so
+    # transform each (model, condition) once up front instead of per pair
+    phi_dict = {m: {c: asin(sqrt(p)) for c, p in d.items()} for m, d in data_dict.items()}
+
+    # Organize comparisons; combinations over items() hoists the per-model
+    # dict lookups out of the condition loop, and the keys intersection
+    # replaces per-condition membership tests
     comparisons = []
-    models = list(data_dict.keys())
-    
-    for i in range(len(models)):
-        for j in range(i+1, len(models)):
-            model1, model2 = models[i], models[j]
-            
-            for condition in data_dict[model1].keys():
-                if condition in data_dict[model2]:
-                    p1 = data_dict[model1][condition]
-                    p2 = data_dict[model2][condition]
-                    
-                    study_name = f"{model1} vs {model2}"
-                    if comparison_type:
-                        study_name = f"{comparison_type}: {study_name} ({condition})"
-                    else:
-                        study_name = f"{study_name} ({condition})"
-                        
-                    comparisons.append((p1, p2, study_name))
-    
-    # Run comparisons
-    for p1, p2, study_name in comparisons:
-        results.append(analyze_proportion_comparison(p1, p2, n1, n2, study_name))
-    
-    return results
+
+    for (model1, d1), (model2, d2) in itertools.combinations(data_dict.items(), 2):
+        phi1_d, phi2_d = phi_dict[model1], phi_dict[model2]
+
+        common = d1.keys() & d2.keys()
+        for condition in (c for c in d1 if c in common):
+            study_name = f"{model1} vs {model2}"
+            if comparison_type:
+                study_name = f"{comparison_type}: {study_name} ({condition})"
+            else:
+                study_name = f"{study_name} ({condition})"
+
+            comparisons.append((d1[condition], d2[condition], study_name,
+                                phi1_d[condition], phi2_d[condition]))
+
+    if not comparisons:
+        return ResultsTable.from_rows([])
+
+    # Deduplicate on the numeric key: identical (p1, p2) pairs shared by
+    # several study names are computed once and fanned back out
+    unique_inputs = []
+    index_of = {}
+    for p1, p2, study_name, phi1, phi2 in comparisons:
+        if (p1, p2) not in index_of:
+            index_of[(p1, p2)] = len(unique_inputs)
+            unique_inputs.append((p1, p2, phi1, phi2))
+
+    u_p1, u_p2, u_phi1, u_phi2 = zip(*unique_inputs)
+    unique_results = analyze_proportion_comparison_batch(
+        u_p1, u_p2, n1, n2, [""] * len(unique_inputs), phi1=u_phi1, phi2=u_phi2)
+
+    # Fan the deduplicated rows back out with one take per column
+    return unique_results.take(
+        [index_of[(p1, p2)] for p1, p2, _, _, _ in comparisons],
+        study=[study_name for _, _, study_name, _, _ in comparisons])
 
 
 # Example usage
@@ -234,5 +360,4 @@ if __name__ == "__main__":
     
     # Create APA table
     print("\n--- APA-Style Results Table ---")
-    apa_table = create_apa_table(specific_results)
-    print(apa_table.to_string(index=False))
\ No newline at end of file
+    print(create_apa_table_str(specific_results))
\ No newline at end of file